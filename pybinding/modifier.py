@@ -6,12 +6,13 @@ such as various fields, defects or geometric deformations.
 import inspect
 import functools
 import warnings
+from collections import OrderedDict
 
 import numpy as np
 
 from . import _cpp
 from .system import Sites
-from .support.inspect import get_call_signature
+from .support.inspect import CallSignature
 from .support.alias import AliasIndex, SplitName
 from .support.deprecated import LoudDeprecationWarning
 from .utils.misc import decorator_decorator
@@ -21,62 +22,105 @@ __all__ = ['constant_potential', 'force_double_precision', 'force_complex_number
            'site_generator', 'site_position_modifier', 'site_state_modifier']
 
 
-def _process_modifier_args(args, keywords, requested_argnames):
+@functools.lru_cache(maxsize=256)
+def _alias_index(name, shape, orbs):
+    """Return the `AliasIndex` for a sub_id/hop_id argument
+
+    Consecutive modifiers are applied to the same site or hopping family, so they
+    share the same (immutable) index object instead of creating a new one each.
+    """
+    return AliasIndex(SplitName(name), shape, orbs)
+
+
+def _contiguous(obj):
+    """Make sure array arguments are C-contiguous so that user functions run at full speed
+
+    This is normally a no-op: the arrays are views of contiguous C++ buffers. A copy
+    keeps the read-only flag of the original to preserve the modifier's mutability rules.
+    """
+    if not isinstance(obj, np.ndarray) or obj.flags.c_contiguous:
+        return obj
+    copy = np.ascontiguousarray(obj)
+    copy.flags.writeable = obj.flags.writeable
+    return copy
+
+
+def _process_modifier_args(args, requested_args, sites_args=None):
     """Return only the requested modifier arguments
 
     Also process any special args like 'sub_id', 'hop_id' and 'sites'.
+
+    Parameters
+    ----------
+    args : tuple
+        All the arguments passed to the modifier from the C++ side.
+    requested_args : tuple
+        Triples of (name, index, is_alias) which select the requested arguments from `args`.
+        Precomputed by :func:`_make_modifier` so nothing is looked up by name here.
+    sites_args : Optional[tuple]
+        Indices of the 'x, y, z, sub_id' arguments if the :class:`Sites` helper is requested.
     """
     prime_arg = args[0]
-    if isinstance(prime_arg, np.ndarray):
-        if prime_arg.ndim > 1:
-            # Move axis so that sites are first -- makes a nicer modifier interface
-            norb1, norb2, nsites = prime_arg.shape
-            prime_arg = np.moveaxis(prime_arg, 2, 0)
-            args = [prime_arg] + list(args[1:])
-            shape = nsites, 1, 1
-            orbs = norb1, norb2
+    if prime_arg.ndim > 1:
+        # Move axis so that sites are first -- makes a nicer modifier interface
+        norb1, norb2, nsites = prime_arg.shape
+        prime_arg = np.moveaxis(prime_arg, 2, 0)
+        args = [prime_arg] + list(args[1:])
+        shape = nsites, 1, 1
+        orbs = norb1, norb2
+
+        # Per-site arrays need to broadcast against the (nsites, norb1, norb2) prime argument
+        for _, i, is_alias in requested_args:
+            if i != 0 and not is_alias:
+                args[i] = obj = _contiguous(args[i])
+                if isinstance(obj, np.ndarray) and obj.size == nsites:
+                    obj.shape = shape
+    else:
+        # Single orbital: all the arrays already have the same 1D shape
+        shape = prime_arg.shape
+        orbs = 1, 1
+
+    requested_kwargs = {}
+    for name, i, is_alias in requested_args:
+        if is_alias:
+            requested_kwargs[name] = _alias_index(args[i], shape, orbs)
+        elif i == 0:
+            requested_kwargs[name] = prime_arg  # modified in place, so it must remain a view
         else:
-            shape = prime_arg.shape
-            orbs = 1, 1
-
-    def process(obj):
-        if isinstance(obj, str):
-            return AliasIndex(SplitName(obj), shape, orbs)
-        elif isinstance(obj, np.ndarray) and obj.size == shape[0]:
-            obj.shape = shape
-            return obj
-        else:
-            return obj
+            requested_kwargs[name] = _contiguous(args[i])
 
-    kwargs = dict(zip(keywords, args))
-    requested_kwargs = {k: process(v) for k, v in kwargs.items()
-                        if k in requested_argnames}
+    if sites_args:
+        ix, iy, iz, isub = sites_args
+        requested_kwargs["sites"] = Sites._from_arrays(args[ix], args[iy], args[iz], args[isub])
 
-    if "sites" in requested_argnames and "sites" not in kwargs:
-        requested_kwargs["sites"] = Sites((kwargs[k] for k in ("x", "y", "z")), kwargs["sub_id"])
+    return requested_kwargs
 
-    if "system" in keywords:
-        requested_kwargs.update({p: getattr(kwargs["system"], p) for p in "xyz"
-                                 if p in requested_argnames})
 
-    return requested_kwargs
+def _requested_args(keywords, requested_argnames):
+    """Return (name, index, is_alias) triples of the requested arguments within `keywords`
+
+    The family names ('sub_id' and 'hop_id') are always passed as strings which need
+    to be wrapped in an :class:`AliasIndex`. They are identified here by name, once,
+    instead of checking the type of every argument on every call.
+    """
+    return tuple((name, keywords.index(name), name in ("sub_id", "hop_id"))
+                 for name in requested_argnames if name in keywords)
 
 
-def _check_modifier_spec(func, keywords, has_sites=False):
+def _check_modifier_spec(argnames, keywords, has_sites=False):
     """Make sure the arguments are specified correctly
 
     Parameters
     ----------
-    func : callable
-        The function which is to become a modifier.
-    keywords : list
-        Used to check that `func` arguments are correct.
+    argnames : tuple of str
+        Parameter names of the function which is to become a modifier.
+    keywords : tuple of str
+        Allowed argument names; each of `argnames` must be one of these.
     has_sites : bool
         Check for 'site' argument.
     """
-    argnames = inspect.signature(func).parameters.keys()
     if has_sites:
-        keywords += ["sites"]
+        keywords += ("sites",)
     unexpected = ", ".join([name for name in argnames if name not in keywords])
     if unexpected:
         expected = ", ".join(keywords)
@@ -99,30 +143,84 @@ def _sanitize_modifier_result(result, args, expected_num_return, can_be_complex)
     if any(r.size != prime_arg.size for r in result):
         raise TypeError("Modifier must return the same size ndarray as the arguments")
 
+    dtype = prime_arg.dtype
+
     def cast(r):
         """Cast the result back to the same data type as the arguments"""
-        try:
-            return r.astype(prime_arg.dtype, casting="same_kind", copy=False)
-        except TypeError:
-            if np.iscomplexobj(r) and can_be_complex:
-                return r  # fine, the model will be upgraded to complex for certain modifiers
-            else:
-                raise TypeError("Modifier result is '{}', but expected same kind as '{}'"
-                                " (precision is flexible)".format(r.dtype, prime_arg.dtype))
+        if r.dtype == dtype:
+            return r  # the common case: nothing to do
+        elif np.can_cast(r.dtype, dtype, casting="same_kind"):
+            return r.astype(dtype)
+        elif np.iscomplexobj(r) and can_be_complex:
+            return r  # fine, the model will be upgraded to complex for certain modifiers
+        else:
+            raise TypeError("Modifier result is '{}', but expected same kind as '{}'"
+                            " (precision is flexible)".format(r.dtype, dtype))
 
     def moveaxis(r):
-        """If the result is a new contiguous array, the axis needs to be moved back"""
-        if r.ndim == 3 and r.flags["OWNDATA"] and r.flags["C_CONTIGUOUS"]:
+        """If the result is a new contiguous array, the axis needs to be moved back
+
+        Decided by layout alone: arrays allocated elsewhere (e.g. by numba) don't
+        report OWNDATA, but they are still laid out with sites first.
+        """
+        if r.ndim == 3 and r.flags["C_CONTIGUOUS"]:
             return np.moveaxis(r, 0, 2).copy()
         else:
             return r
 
-    result = tuple(map(cast, result))
-    result = tuple(map(moveaxis, result))
-    return result[0] if expected_num_return == 1 else result
+    if expected_num_return == 1:
+        return moveaxis(cast(result[0]))
+    else:
+        return tuple([moveaxis(cast(r)) for r in result])
 
 
-def _make_modifier(func, kind, init, keywords, has_sites=True, num_return=1, can_be_complex=False):
+def _jit_compile(func):
+    """Compile `func` using numba -- the import is deferred since numba is optional"""
+    try:
+        import numba
+    except ImportError:
+        raise ImportError("Modifiers with `jit=True` require numba to be installed")
+
+    try:
+        return numba.njit(cache=True, error_model="numpy")(func)
+    except RuntimeError:  # no cache locator, e.g. the function was defined in an interpreter
+        return numba.njit(error_model="numpy")(func)
+
+
+def _get_callsig(func):
+    """Return the call signature recorded by `decorator_decorator` or a plain `func()` one"""
+    callsig = getattr(func, 'callsig', None)
+    if not callsig:
+        callsig = CallSignature(func, OrderedDict(), (), OrderedDict(), {})
+        func.callsig = callsig  # reuse it if the same function is wrapped again
+    return callsig
+
+
+@functools.lru_cache(maxsize=None)
+def _modifier_class(kind):
+    """Return the Python subclass of the `kind` modifier -- created only once per kind"""
+    class Modifier(kind):
+        def __init__(self, func, apply_func, init):
+            # noinspection PyArgumentList
+            super().__init__(apply_func, **init)
+            self.apply = apply_func
+            self.callsig = _get_callsig(func)
+            self._func = func
+
+        def __str__(self):
+            return str(self.callsig)
+
+        def __repr__(self):
+            return repr(self.callsig)
+
+        def __call__(self, *args, **kwargs):
+            return self._func(*args, **kwargs)
+
+    return Modifier
+
+
+def _make_modifier(func, kind, init, keywords, has_sites=True, num_return=1,
+                   can_be_complex=False, jit=False):
     """Turn a regular function into a modifier of the desired kind
 
     Parameters
@@ -133,49 +231,48 @@ def _make_modifier(func, kind, init, keywords, has_sites=True, num_return=1, can
         Modifier base class.
     init : dict
         Initializer kwargs for the Modifier base class.
-    keywords : str
-        String of comma separated names: the expected arguments of a modifier function.
+    keywords : tuple of str
+        The expected arguments of a modifier function.
     has_sites : bool
         Arguments may include the :class:`Sites` helper.
     num_return : int
         Expected number of return values.
     can_be_complex : bool
         The modifier may return a complex result even if the input is real.
+    jit : bool
+        Compile `func` using numba. Skipped with a warning if `func` takes any of
+        the non-array arguments: 'sub_id', 'hop_id' or 'sites'.
 
     Returns
     -------
     Modifier
     """
-    keywords = [word.strip() for word in keywords.split(",")]
-    _check_modifier_spec(func, keywords, has_sites)
     requested_argnames = tuple(inspect.signature(func).parameters.keys())
+    _check_modifier_spec(requested_argnames, keywords, has_sites)
+    requested_args = _requested_args(keywords, requested_argnames)
+    if "sites" in requested_argnames:
+        sites_args = tuple(keywords.index(name) for name in ("x", "y", "z", "sub_id"))
+    else:
+        sites_args = None
+
+    impl = func
+    if jit:
+        helper_args = [name for name in ("sub_id", "hop_id", "sites")
+                       if name in requested_argnames]
+        if helper_args:
+            name = getattr(func, "__name__", repr(func))
+            warnings.warn("Modifier '{}' will not be compiled with `jit=True` because it takes "
+                          "non-array argument(s): {}".format(name, ", ".join(helper_args)),
+                          stacklevel=3)
+        else:
+            impl = _jit_compile(func)
 
     def apply_func(*args):
-        requested_kwargs = _process_modifier_args(args, keywords, requested_argnames)
-        result = func(**requested_kwargs)
+        requested_kwargs = _process_modifier_args(args, requested_args, sites_args)
+        result = impl(**requested_kwargs)
         return _sanitize_modifier_result(result, args, num_return, can_be_complex)
 
-    class Modifier(kind):
-        callsig = getattr(func, 'callsig', None)
-        if not callsig:
-            callsig = get_call_signature()
-            callsig.function = func
-
-        def __init__(self):
-            # noinspection PyArgumentList
-            super().__init__(apply_func, **init)
-            self.apply = apply_func
-
-        def __str__(self):
-            return str(self.callsig)
-
-        def __repr__(self):
-            return repr(self.callsig)
-
-        def __call__(self, *args, **kwargs):
-            return func(*args, **kwargs)
-
-    return Modifier()
+    return _modifier_class(kind)(func, apply_func, init)
 
 
 @decorator_decorator
@@ -227,7 +324,7 @@ def site_state_modifier(min_neighbors=0):
     """
     return functools.partial(_make_modifier, kind=_cpp.SiteStateModifier,
                              init=dict(min_neighbors=min_neighbors),
-                             keywords="state, x, y, z, sub_id")
+                             keywords=("state", "x", "y", "z", "sub_id"))
 
 
 @decorator_decorator
@@ -272,11 +369,11 @@ def site_position_modifier(*_):
         )
     """
     return functools.partial(_make_modifier, kind=_cpp.PositionModifier, init={},
-                             keywords="x, y, z, sub_id", num_return=3)
+                             keywords=("x", "y", "z", "sub_id"), num_return=3)
 
 
 @decorator_decorator
-def onsite_energy_modifier(is_double=False, **kwargs):
+def onsite_energy_modifier(is_double=False, jit=False, **kwargs):
     """Modify the onsite energy, e.g.\  to apply an electric field
 
     Parameters
@@ -284,6 +381,11 @@ def onsite_energy_modifier(is_double=False, **kwargs):
     is_double : bool
         Requires the model to use double precision floating point values.
         Defaults to single precision otherwise.
+    jit : bool
+        Compile the modifier function using `numba` (must be installed). This can speed
+        up compute-heavy functions considerably. The first model build pays the compilation
+        cost, but the compiled code is cached on disk for subsequent runs. Ignored (with a
+        warning) if the function takes the `sub_id` or `sites` arguments.
 
     Notes
     -----
@@ -324,12 +426,12 @@ def onsite_energy_modifier(is_double=False, **kwargs):
         warnings.warn("Use `is_double` parameter name instead of `double`", LoudDeprecationWarning)
         is_double = kwargs["double"]
     return functools.partial(_make_modifier, kind=_cpp.OnsiteModifier,
-                             init=dict(is_double=is_double), can_be_complex=True,
-                             keywords="energy, x, y, z, sub_id")
+                             init=dict(is_double=is_double), can_be_complex=True, jit=jit,
+                             keywords=("energy", "x", "y", "z", "sub_id"))
 
 
 @decorator_decorator
-def hopping_energy_modifier(is_double=False, is_complex=False, **kwargs):
+def hopping_energy_modifier(is_double=False, is_complex=False, jit=False, **kwargs):
     """Modify the hopping energy, e.g.\  to apply a magnetic field
 
     Parameters
@@ -343,6 +445,11 @@ def hopping_energy_modifier(is_double=False, is_complex=False, **kwargs):
         modifier has returned complex numbers for real input. Manually setting this
         argument to `True` will speed up model build time slightly, but it's not
         necessary for correct operation.
+    jit : bool
+        Compile the modifier function using `numba` (must be installed). This can speed
+        up compute-heavy functions considerably. The first model build pays the compilation
+        cost, but the compiled code is cached on disk for subsequent runs. Ignored (with a
+        warning) if the function takes the `hop_id` argument.
 
     Notes
     -----
@@ -384,8 +491,8 @@ def hopping_energy_modifier(is_double=False, is_complex=False, **kwargs):
         is_double = kwargs["double"]
     return functools.partial(_make_modifier, kind=_cpp.HoppingModifier,
                              init=dict(is_double=is_double, is_complex=is_complex),
-                             can_be_complex=True, has_sites=False,
-                             keywords="energy, x1, y1, z1, x2, y2, z2, hop_id")
+                             can_be_complex=True, has_sites=False, jit=jit,
+                             keywords=("energy", "x1", "y1", "z1", "x2", "y2", "z2", "hop_id"))
 
 
 def constant_potential(magnitude):
@@ -397,8 +504,11 @@ def constant_potential(magnitude):
         In units of eV.
     """
     @onsite_energy_modifier
-    def f(energy, sub_id):
-        return energy + sub_id.eye * magnitude
+    def f(energy):
+        if energy.ndim == 1:
+            return energy + magnitude
+        else:  # multi-orbital: only the diagonal of each (norb, norb) block
+            return energy + np.eye(energy.shape[-1]) * magnitude
     return f
 
 
@@ -418,6 +528,28 @@ def force_complex_numbers():
     return f
 
 
+@functools.lru_cache(maxsize=None)
+def _generator_class(kind):
+    """Return the Python subclass of the `kind` generator -- created only once per kind"""
+    class Generator(kind):
+        def __init__(self, func, name, energy, generator_func):
+            # noinspection PyArgumentList
+            super().__init__(name, energy, generator_func)
+            self.callsig = _get_callsig(func)
+            self._func = func
+
+        def __str__(self):
+            return str(self.callsig)
+
+        def __repr__(self):
+            return repr(self.callsig)
+
+        def __call__(self, *args, **kwargs):
+            return self._func(*args, **kwargs)
+
+    return Generator
+
+
 def _make_generator(func, kind, name, energy, keywords, process_result=lambda x, *_: x):
     """Turn a regular function into a generator of the desired kind
 
@@ -427,40 +559,21 @@ def _make_generator(func, kind, name, energy, keywords, process_result=lambda x,
         The function which is to become a modifier.
     kind : object
         Modifier base class.
-    keywords : str
-        String of comma separated names: the expected arguments of a modifier function.
+    keywords : tuple of str
+        The expected arguments of a modifier function.
     process_result : Callable
         Apply additional processing on the generator result
     """
-    keywords = [word.strip() for word in keywords.split(",")]
-    _check_modifier_spec(func, keywords)
     requested_argnames = tuple(inspect.signature(func).parameters.keys())
+    _check_modifier_spec(requested_argnames, keywords)
 
-    def generator_func(*args):
-        requested_kwargs = _process_modifier_args(args, keywords, requested_argnames)
+    def generator_func(system):
+        requested_kwargs = {name: system if name == "system" else getattr(system, name)
+                            for name in requested_argnames}
         result = func(**requested_kwargs)
-        return process_result(result, *args)
-
-    class Generator(kind):
-        callsig = getattr(func, 'callsig', None)
-        if not callsig:
-            callsig = get_call_signature()
-            callsig.function = func
-
-        def __init__(self):
-            # noinspection PyArgumentList
-            super().__init__(name, energy, generator_func)
-
-        def __str__(self):
-            return str(self.callsig)
-
-        def __repr__(self):
-            return repr(self.callsig)
-
-        def __call__(self, *args, **kwargs):
-            return func(*args, **kwargs)
+        return process_result(result, system)
 
-    return Generator()
+    return _generator_class(kind)(func, name, energy, generator_func)
 
 
 @decorator_decorator
@@ -493,7 +606,7 @@ def site_generator(name, energy):
         Tuple of (x, y, z) arrays which indicate the positions of the new sites.
     """
     return functools.partial(_make_generator, kind=_cpp.SiteGenerator,
-                             name=name, energy=energy, keywords="system, x, y, z")
+                             name=name, energy=energy, keywords=("system", "x", "y", "z"))
 
 
 @decorator_decorator
@@ -534,4 +647,4 @@ def hopping_generator(name, energy):
         return tuple(process(v) for v in result)
 
     return functools.partial(_make_generator, kind=_cpp.HoppingGenerator, name=name, energy=energy,
-                             process_result=process_result, keywords="system, x, y, z")
+                             process_result=process_result, keywords=("system", "x", "y", "z"))
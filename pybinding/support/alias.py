@@ -9,7 +9,8 @@ class AliasArray(np.ndarray):
     their friendly string identifiers. The mapping parameter translates sublattice
     or hopping names into their number IDs.
 
-    Only the `==` and `!=` operators are overloaded to handle the aliases.
+    Only the `==` and `!=` operators are overloaded to handle the aliases. They return
+    plain boolean ndarrays, so combining masks doesn't carry along the mapping.
 
     Examples
     --------
@@ -20,6 +21,8 @@ class AliasArray(np.ndarray):
     [True, False, True]
     >>> list(a != "A")
     [False, True, False]
+    >>> type(a == "A") is np.ndarray
+    True
     >>> a = AliasArray([0, 1, 0, 2], mapping={"A|1": 0, "B": 1, "A|2": 2})
     >>> list(a == "A")
     [True, False, True, True]
@@ -42,26 +45,48 @@ class AliasArray(np.ndarray):
         self.mapping = getattr(obj, "mapping", None)
 
     def _mapped_eq(self, other):
+        data = self.view(np.ndarray)
         if other in self.mapping:
-            return super().__eq__(self.mapping[other])
+            return data == self.mapping[other]
         else:
-            result = np.zeros(len(self), dtype=np.bool)
+            result = np.zeros(len(self), dtype=np.bool_)
             for k, v in self.mapping.items():
                 if k == other:
-                    result = np.logical_or(result, super().__eq__(v))
+                    result |= data == v
             return result
 
     def __eq__(self, other):
+        """Comparison results are plain ndarrays -- they don't need the mapping"""
         if isinstance(other, str):
             return self._mapped_eq(other)
         else:
-            return super().__eq__(other)
+            return self.view(np.ndarray) == other
 
     def __ne__(self, other):
         if isinstance(other, str):
             return np.logical_not(self._mapped_eq(other))
         else:
-            return super().__ne__(other)
+            return self.view(np.ndarray) != other
+
+    def isin(self, names):
+        """Return a boolean mask of the elements which match any of the given `names`
+
+        Same as `(a == names[0]) | (a == names[1]) | ...` but done in a single pass
+        without any intermediate masks.
+
+        Examples
+        --------
+        >>> a = AliasArray([0, 1, 2, 1], mapping={"A|1": 0, "B": 1, "C": 2})
+        >>> list(a.isin(["A", "C"]))
+        [True, False, True, False]
+        >>> list(a.isin(["B"]) == (a == "B"))
+        [True, True, True, True]
+        >>> list(a.isin("A"))
+        [True, False, False, False]
+        """
+        names = (names,) if isinstance(names, str) else tuple(names)
+        ids = [v for k, v in self.mapping.items() if any(k == name for name in names)]
+        return np.isin(self.view(np.ndarray), ids)
 
     def __reduce__(self):
         r = super().__reduce__()
@@ -133,7 +158,8 @@ class AliasIndex:
     all `True` or all `False`. See the examples below. This is useful for modifiers
     where the each call gets arrays with the same sub_id/hop_id for all elements.
     Instead of passing an `AliasArray` with `.size` identical element, `AliasIndex`
-    does the same all-or-nothing indexing.
+    does the same all-or-nothing indexing. It's a plain object rather than an ndarray
+    subclass, so creating one for every modifier call is cheap.
 
     Examples
     --------
@@ -155,6 +181,10 @@ class AliasIndex:
     True
     >>> bool(ai != "A")
     False
+    >>> list(l[ai.isin(["B", "A"])])
+    [1, 2, 3]
+    >>> list(l[ai.isin("AB")])
+    []
     >>> str(ai)
     'A'
     >>> hash(ai) == hash("A")
@@ -165,6 +195,8 @@ class AliasIndex:
     True
     """
     class LazyArray:
+        __slots__ = ("value", "shape")
+
         def __init__(self, value, shape):
             self.value = value
             self.shape = shape
@@ -172,8 +204,10 @@ class AliasIndex:
         def __bool__(self):
             return bool(self.value)
 
-        def __array__(self):
-            return np.full(self.shape, self.value)
+        def __array__(self, dtype=None):
+            return np.full(self.shape, self.value, dtype=dtype)
+
+    __slots__ = ("name", "shape", "orbs")
 
     def __init__(self, name, shape, orbs=(1, 1)):
         self.name = name
@@ -192,6 +226,11 @@ class AliasIndex:
     def __hash__(self):
         return hash(self.name)
 
+    def isin(self, names):
+        """Same as :meth:`AliasArray.isin`: true if the index matches any of the `names`"""
+        names = (names,) if isinstance(names, str) else tuple(names)
+        return self.LazyArray(any(self.name == name for name in names), self.shape)
+
     @property
     def eye(self):
         return np.eye(*self.orbs)
@@ -96,11 +96,14 @@ def get_call_signature(up=0):
     >>> outer(2)()
     outer.<locals>.inner(y=2)
     """
-    stack = inspect.stack()
-    try:
-        frame, _, _, func_name, *_ = stack[up + 1]
-    except:
+    # Walk the frames directly: `inspect.stack()` would also read the source
+    # code context of every frame on the stack, which is very slow
+    frame = inspect.currentframe()
+    for _ in range(up + 1):
+        frame = frame.f_back if frame else None
+    if frame is None:
         raise IndexError("Stack frame out of range")
+    func_name = frame.f_code.co_name
 
     if func_name == '<module>':
         raise IndexError("Can't inspect a module")
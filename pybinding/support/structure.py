@@ -156,6 +156,18 @@ class Sites(AbstractSites):
         if ids is not None:
             self._ids = np.atleast_1d(ids)
 
+    @classmethod
+    def _from_arrays(cls, x, y, z, ids):
+        """Wrap existing x, y, z arrays of the same shape and dtype without copying them
+
+        Used for modifier arguments: unlike the regular constructor, the positions are
+        not stacked into a new array and remain views of the caller's data.
+        """
+        sites = cls.__new__(cls)
+        sites._x, sites._y, sites._z = x, y, z
+        sites._ids = np.atleast_1d(ids)
+        return sites
+
     @property
     def x(self):
         return self._x
@@ -2,7 +2,7 @@ import pytest
 
 import numpy as np
 import pybinding as pb
-from pybinding.repository import graphene
+from pybinding.repository import graphene, group6_tmd
 
 
 one, zero = np.ones(1), np.zeros(1)
@@ -295,6 +295,52 @@ def test_hopping_energy():
     assert model.hamiltonian.dtype == np.complex128
 
 
+def test_jit():
+    """Compiled modifiers must produce the same result as regular Python functions"""
+    # Functions with non-array arguments fall back to Python (numba is not needed)
+    def sublattice_offset(energy, sub_id):
+        energy[sub_id == "A"] += 1
+        return energy
+
+    with pytest.warns(UserWarning) as record:
+        mod = pb.onsite_energy_modifier(jit=True)(sublattice_offset)
+    assert "will not be compiled" in str(record[0].message)
+
+    fallback_model = build_model(mod)
+    expected = build_model(pb.onsite_energy_modifier(sublattice_offset))
+    assert pytest.fuzzy_equal(fallback_model.hamiltonian, expected.hamiltonian)
+
+    pytest.importorskip("numba")
+
+    def wavy(energy, x, y):
+        return energy + np.sin(x)**2 + np.cos(y)**2
+
+    def peierls(energy, x1, y1, x2, y2):
+        return energy * np.exp(1j * 0.5 * (y1 + y2) * (x1 - x2))
+
+    model = build_model(pb.onsite_energy_modifier(wavy), pb.hopping_energy_modifier(peierls))
+    jit_model = build_model(pb.onsite_energy_modifier(jit=True)(wavy),
+                            pb.hopping_energy_modifier(jit=True)(peierls))
+    assert jit_model.hamiltonian.dtype == np.complex64
+    assert pytest.fuzzy_equal(jit_model.hamiltonian, model.hamiltonian)
+
+    # Multi-orbital energy blocks are passed with the sites axis first and must be moved back
+    def onsite_shift(energy, x):
+        return energy + x
+
+    def hopping_shift(energy, x1):
+        return energy + x1
+
+    def tmd_model(*params):
+        return pb.Model(group6_tmd.monolayer_3band("MoS2"), pb.primitive(2, 2), *params)
+
+    model = tmd_model(pb.onsite_energy_modifier(onsite_shift),
+                      pb.hopping_energy_modifier(hopping_shift))
+    jit_model = tmd_model(pb.onsite_energy_modifier(jit=True)(onsite_shift),
+                          pb.hopping_energy_modifier(jit=True)(hopping_shift))
+    assert pytest.fuzzy_equal(jit_model.hamiltonian, model.hamiltonian)
+
+
 def test_site_generator():
     """Generated some disordered sites"""
     @pb.site_generator("New", energy=0.4)
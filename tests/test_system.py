@@ -69,6 +69,29 @@ def test_sites():
     assert sites.find_nearest([0, 0], 'A') != sites.find_nearest([0, 0], 'B')
 
 
+def test_sites_normalization():
+    """Positions are converted to a single array: common dtype, own copy, scalar indexing"""
+    x = np.array([0, 1, 1.1])
+    sites = pb.system.Sites((x, [0, 0, 0], [0, 0, 0]), [0, 1, 0])
+    assert sites.x.dtype == sites.y.dtype == sites.z.dtype == np.float64
+    assert np.isscalar(sites[1].x) or sites[1].x.ndim == 0
+    assert sites[1].x == 1 and sites[1].ids == 1
+
+    x[0] = 99
+    assert sites.x[0] == 0
+
+
+def test_sublattice_isin():
+    model = pb.Model(graphene.monolayer(), pb.primitive(2, 2))
+    sub = model.system.sublattices
+
+    assert np.all(sub.isin(["A", "B"]))
+    assert np.all(sub.isin("A") == (sub == "A"))
+    assert np.all(sub.isin(name for name in ["B"]) == (sub == "B"))
+    assert not np.any(sub.isin("AB"))
+    assert not np.any(sub.isin([]))
+
+
 def test_system_plot(compare_figure):
     model = pb.Model(graphene.bilayer(), graphene.hexagon_ac(0.1))
     with compare_figure() as chk: